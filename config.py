@@ -2,13 +2,16 @@
 Configuration constants for the nutrition optimization module.
 """
 
+from types import MappingProxyType
+
 # Weight conversion constants (all to ounces)
 OZ_PER_LB = 16.0
 GRAMS_PER_OZ = 28.3495
 KG_TO_OZ = 1000 / GRAMS_PER_OZ
 
-# Conversion factors to ounces for different weight units
-WEIGHT_CONVERSION = {
+# Conversion factors to ounces for different weight units.
+# Keys are lowercase; the mapping is read-only since to_oz relies on that.
+WEIGHT_CONVERSION = MappingProxyType({
     'oz': 1.0,
     'ozs': 1.0,
     'ounce': 1.0,
@@ -24,7 +27,34 @@ WEIGHT_CONVERSION = {
     'kilogram': KG_TO_OZ,
     'kilograms': KG_TO_OZ,
     'kilo': KG_TO_OZ,
-}
+})
+
+
+def to_oz(weight: float, unit: str) -> float:
+    """
+    Convert a weight to ounces.
+    
+    Units are matched case-insensitively. Units that are already lowercase
+    (the common case for CSV data) are resolved with a single dict lookup.
+    
+    Args:
+        weight: Weight value
+        unit: Unit of weight ('oz', 'lb', 'g', 'kg', etc.)
+    
+    Returns:
+        Weight in ounces
+    
+    Raises:
+        ValueError: If the unit is not supported
+    """
+    factor = WEIGHT_CONVERSION.get(unit)
+    if factor is None:
+        factor = WEIGHT_CONVERSION.get(unit.lower())
+        if factor is None:
+            raise ValueError(f"Invalid weight unit: {unit}. "
+                             f"Supported units: {list(WEIGHT_CONVERSION.keys())}")
+    return weight * factor
+
 
 # Macronutrient targets (percentages)
 MACRONUTRIENT_TARGETS = {
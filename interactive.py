@@ -4,42 +4,105 @@ Interactive user interface module for cat food nutrition optimizer.
 This module handles user input for selecting food items and configuring treat preferences.
 """
 
-from typing import List, Set
+import re
+import sys
+from typing import List, Set, Tuple
 import nutrition
 
 
-def display_items(items: List[nutrition.Item]) -> None:
+# A whole selection such as "1,3,5" or "1 3 5", and each item number in it
+_SELECTION = re.compile(r'\s*\d+(?:\s*[,\s]\s*\d+)*\s*')
+_SELECTION_NUMBER = re.compile(r'\d+')
+
+# Section separators used by the display blocks
+_DIVIDER = "=" * 80
+_RULE = "-" * 50
+
+# Input prompts and accepted yes/no answers
+_SELECTION_PROMPT = "\nEnter item numbers: "
+_TREAT_PROMPT = "\nInclude at least one treat? (y/n): "
+_CONFIRM_PROMPT = "Proceed with calculation? (y/n): "
+_YES = frozenset({'y', 'yes'})
+_NO = frozenset({'n', 'no'})
+
+
+def _write_lines(lines: List[str]) -> None:
+    """Write a block of lines to stdout with a single write call."""
+    sys.stdout.write("\n".join(lines) + "\n")
+
+
+def _read_response(prompt: str) -> str:
     """
-    Display a numbered list of all available food items and treats.
+    Write a prompt and read one line of user input.
+    
+    Args:
+        prompt: Text to display before reading
+    
+    Returns:
+        The entered line with surrounding whitespace removed
+    
+    Raises:
+        KeyboardInterrupt: If input is closed (EOF), so callers treat it as a cancel
+    """
+    sys.stdout.write(prompt)
+    sys.stdout.flush()
+    line = sys.stdin.readline()
+    if not line:
+        raise KeyboardInterrupt
+    return line.strip()
+
+
+def _partition(items: List[nutrition.Item]) -> Tuple[List[nutrition.Item], List[nutrition.Item]]:
+    """
+    Split items into foods and treats in a single pass.
     
     Args:
-        items: List of Item objects to display
+        items: List of Item objects
+    
+    Returns:
+        Tuple of (foods, treats), each preserving the original order
     """
-    print("\n" + "="*80)
-    print("AVAILABLE FOOD ITEMS AND TREATS")
-    print("="*80)
+    foods = []
+    treats = []
+    for item in items:
+        if item.item_type == 'food':
+            foods.append(item)
+        else:
+            treats.append(item)
+    return foods, treats
+
+
+def display_items(foods: List[nutrition.Item], treats: List[nutrition.Item]) -> None:
+    """
+    Display a numbered list of all available food items and treats.
     
-    foods = [item for item in items if item.item_type == 'food']
-    treats = [item for item in items if item.item_type == 'treat']
+    Foods are numbered first, followed by treats.
+    
+    Args:
+        foods: List of food Item objects to display
+        treats: List of treat Item objects to display
+    """
+    lines = ["\n" + _DIVIDER, "AVAILABLE FOOD ITEMS AND TREATS", _DIVIDER]
     
     if foods:
-        print(f"\nFOOD ITEMS ({len(foods)} available):")
-        print("-" * 50)
+        lines.append(f"\nFOOD ITEMS ({len(foods)} available):")
+        lines.append(_RULE)
         for i, item in enumerate(foods, 1):
-            print(f"{i:2d}. {item.name}")
-            print(f"    Calories/oz: {item.calories_per_oz}, Protein: {item.min_protein}%, "
-                  f"Carbs: {item.max_carbs}%, Fat: {item.min_fat}%")
+            lines.append(f"{i:2d}. {item.name}")
+            lines.append(f"    Calories/oz: {item.calories_per_oz}, Protein: {item.min_protein}%, "
+                         f"Carbs: {item.max_carbs}%, Fat: {item.min_fat}%")
     
     if treats:
-        print(f"\nTREATS ({len(treats)} available):")
-        print("-" * 50)
+        lines.append(f"\nTREATS ({len(treats)} available):")
+        lines.append(_RULE)
         start_idx = len(foods) + 1
         for i, item in enumerate(treats, start_idx):
-            print(f"{i:2d}. {item.name}")
-            print(f"    Calories/oz: {item.calories_per_oz}, Protein: {item.min_protein}%, "
-                  f"Carbs: {item.max_carbs}%, Fat: {item.min_fat}%")
+            lines.append(f"{i:2d}. {item.name}")
+            lines.append(f"    Calories/oz: {item.calories_per_oz}, Protein: {item.min_protein}%, "
+                         f"Carbs: {item.max_carbs}%, Fat: {item.min_fat}%")
     
-    print("\n" + "="*80)
+    lines.append("\n" + _DIVIDER)
+    _write_lines(lines)
 
 
 def get_user_selection(items: List[nutrition.Item]) -> List[nutrition.Item]:
@@ -55,24 +118,12 @@ def get_user_selection(items: List[nutrition.Item]) -> List[nutrition.Item]:
     Raises:
         ValueError: If user input is invalid
     """
-    # Create display mapping: display_number -> item
-    foods = [item for item in items if item.item_type == 'food']
-    treats = [item for item in items if item.item_type == 'treat']
-    
-    display_to_item = {}
-    display_num = 1
+    # Create display mapping: display_number -> item (foods first, then treats)
+    foods, treats = _partition(items)
+    display_to_item = dict(enumerate(foods + treats, 1))
+    max_display_num = len(display_to_item)
     
-    # Map foods first
-    for item in foods:
-        display_to_item[display_num] = item
-        display_num += 1
-    
-    # Map treats second
-    for item in treats:
-        display_to_item[display_num] = item
-        display_num += 1
-    
-    display_items(items)
+    display_items(foods, treats)
     
     print("\nSELECTION INSTRUCTIONS:")
     print("- Enter the numbers of items you want to include (e.g., '1,3,5' or '1 3 5')")
@@ -81,26 +132,21 @@ def get_user_selection(items: List[nutrition.Item]) -> List[nutrition.Item]:
     
     while True:
         try:
-            user_input = input("\nEnter item numbers: ").strip()
+            user_input = _read_response(_SELECTION_PROMPT)
             
             if not user_input:
                 # Select all items if no input
                 print("Selected all items.")
                 return items
             
-            # Parse user input
-            if ',' in user_input:
-                indices = [int(x.strip()) for x in user_input.split(',')]
-            else:
-                indices = [int(x.strip()) for x in user_input.split()]
+            # Parse user input (numbers separated by commas and/or spaces)
+            if not _SELECTION.fullmatch(user_input):
+                print("Please enter valid numbers separated by commas or spaces.")
+                continue
+            indices = list(map(int, _SELECTION_NUMBER.findall(user_input)))
             
             # Validate indices
-            if not indices:
-                print("Please enter at least one item number.")
-                continue
-                
-            max_display_num = len(foods) + len(treats)
-            if any(idx < 1 or idx > max_display_num for idx in indices):
+            if min(indices) < 1 or max(indices) > max_display_num:
                 print(f"Please enter numbers between 1 and {max_display_num}.")
                 continue
             
@@ -108,8 +154,7 @@ def get_user_selection(items: List[nutrition.Item]) -> List[nutrition.Item]:
             selected_items = [display_to_item[idx] for idx in indices]
             
             # Display selection summary
-            selected_foods = [item for item in selected_items if item.item_type == 'food']
-            selected_treats = [item for item in selected_items if item.item_type == 'treat']
+            selected_foods, selected_treats = _partition(selected_items)
             
             print(f"\nSELECTED ITEMS:")
             print(f"- Food items: {len(selected_foods)}")
@@ -122,8 +167,6 @@ def get_user_selection(items: List[nutrition.Item]) -> List[nutrition.Item]:
             
             return selected_items
             
-        except ValueError:
-            print("Please enter valid numbers separated by commas or spaces.")
         except KeyboardInterrupt:
             print("\nOperation cancelled.")
             return []
@@ -143,12 +186,12 @@ def get_treat_preference() -> bool:
     
     while True:
         try:
-            response = input("\nInclude at least one treat? (y/n): ").strip().lower()
+            response = _read_response(_TREAT_PROMPT).lower()
             
-            if response in ['y', 'yes']:
+            if response in _YES:
                 print("✓ At least one treat will be included in the meal.")
                 return True
-            elif response in ['n', 'no']:
+            elif response in _NO:
                 print("✓ Optimizing purely for nutrition (treats optional).")
                 return False
             else:
@@ -172,26 +215,28 @@ def confirm_calculation(total_calories: float, selected_items: List[nutrition.It
     Returns:
         True if user confirms, False otherwise
     """
-    print("\n" + "="*80)
-    print("CALCULATION SUMMARY")
-    print("="*80)
-    print(f"Target calories: {total_calories}")
-    print(f"Selected items: {len(selected_items)}")
-    print(f"Treat preference: {'Include at least one treat' if include_treat else 'Optimize for nutrition'}")
-    
-    print(f"\nSelected items:")
+    lines = [
+        "\n" + _DIVIDER,
+        "CALCULATION SUMMARY",
+        _DIVIDER,
+        f"Target calories: {total_calories}",
+        f"Selected items: {len(selected_items)}",
+        f"Treat preference: {'Include at least one treat' if include_treat else 'Optimize for nutrition'}",
+        "\nSelected items:",
+    ]
     for i, item in enumerate(selected_items, 1):
-        print(f"{i:2d}. {item.name} ({item.item_type})")
+        lines.append(f"{i:2d}. {item.name} ({item.item_type})")
     
-    print("\n" + "="*80)
+    lines.append("\n" + _DIVIDER)
+    _write_lines(lines)
     
     while True:
         try:
-            response = input("Proceed with calculation? (y/n): ").strip().lower()
+            response = _read_response(_CONFIRM_PROMPT).lower()
             
-            if response in ['y', 'yes']:
+            if response in _YES:
                 return True
-            elif response in ['n', 'no']:
+            elif response in _NO:
                 return False
             else:
                 print("Please enter 'y' for yes or 'n' for no.")
@@ -208,48 +253,49 @@ def display_results(results: List[tuple], total_calories: float, selected_items:
     Args:
         results: List of (item_name, quantity) tuples
         total_calories: Target calories
+        selected_items: Items selected for calculation
     """
     if not results:
         print("\n❌ No solution found that meets all constraints.")
         print("Try adjusting your selection or treat preferences.")
         return
     
-    print("\n" + "="*80)
-    print("OPTIMAL MEAL PLAN")
-    print("="*80)
+    # Index items by name once so each result row is an O(1) lookup
+    by_name = {item.name: item for item in selected_items}
     
     total_oz = sum(qty for _, qty in results)
-    actual_calories = sum(qty * next(item.calories_per_oz for item in selected_items if item.name == name) 
-                        for name, qty in results)
-    
-    print(f"Target calories: {total_calories}")
-    print(f"Actual calories: {actual_calories:.1f}")
-    print(f"Total quantity: {total_oz:.2f} oz")
-    
-    print(f"\nRECOMMENDED AMOUNTS:")
-    print("-" * 50)
+    actual_calories = sum(qty * by_name[name].calories_per_oz for name, qty in results)
     
-    food_items = []
-    treat_items = []
+    lines = [
+        "\n" + _DIVIDER,
+        "OPTIMAL MEAL PLAN",
+        _DIVIDER,
+        f"Target calories: {total_calories}",
+        f"Actual calories: {actual_calories:.1f}",
+        f"Total quantity: {total_oz:.2f} oz",
+        "\nRECOMMENDED AMOUNTS:",
+        _RULE,
+    ]
     
+    # Single pass: drop zero quantities and bucket the rest by item type
+    buckets = {'food': [], 'treat': []}
     for name, qty in results:
-        if qty > 0:
-            # Find the item to get its type
-            item = next((item for item in selected_items if item.name == name), None)
-            if item:
-                if item.item_type == 'food':
-                    food_items.append((name, qty))
-                else:
-                    treat_items.append((name, qty))
+        if qty <= 0:
+            continue
+        item = by_name.get(name)
+        if item:
+            buckets[item.item_type].append((name, qty))
+    food_items, treat_items = buckets['food'], buckets['treat']
     
     if food_items:
-        print("Food items:")
+        lines.append("Food items:")
         for name, qty in food_items:
-            print(f"  • {name}: {qty:.2f} oz")
+            lines.append(f"  • {name}: {qty:.2f} oz")
     
     if treat_items:
-        print("Treats:")
+        lines.append("Treats:")
         for name, qty in treat_items:
-            print(f"  • {name}: {qty:.2f} oz")
+            lines.append(f"  • {name}: {qty:.2f} oz")
     
-    print("\n" + "="*80)
+    lines.append("\n" + _DIVIDER)
+    _write_lines(lines)
@@ -6,15 +6,35 @@ the main application entry point.
 """
 
 import csv
-from typing import List
+import functools
+import io
+from typing import List, Tuple
 import nutrition
-import interactive
+
+
+def _read_csv_text(path: str) -> io.StringIO:
+    """
+    Read a whole CSV file in one call and wrap it for csv readers.
+    
+    Line endings are preserved (newline='') as the csv module requires.
+    """
+    with open(path, 'r', newline='') as f:
+        return io.StringIO(f.read(), newline='')
+
+
+def _safe_float(value: str, default: float = None) -> float:
+    """Convert a CSV cell to float, returning default for empty or blank cells."""
+    # isspace() only runs for non-empty cells and, unlike strip(), builds no new string
+    return float(value) if value and not value.isspace() else default
 
 
 def load_items_from_csv(csv_file: str) -> List[nutrition.Item]:
     """
     Load items from a CSV file and create Item objects.
     
+    The file is parsed once per path and cached for the lifetime of the process;
+    each call returns a new list.
+    
     CSV format:
     name,type,calories,weight,weight_unit,min_protein,max_fiber,min_fat,max_moisture,ash,max_carbs
     
@@ -34,32 +54,57 @@ def load_items_from_csv(csv_file: str) -> List[nutrition.Item]:
         FileNotFoundError: If the CSV file doesn't exist
         ValueError: If the CSV format is invalid or required fields are missing
     """
-    items = []
-    
+    return list(_read_items_csv(csv_file))
+
+
+@functools.lru_cache(maxsize=None)
+def _read_items_csv(csv_file: str) -> Tuple[nutrition.Item, ...]:
+    """Parse the item CSV once per path; see load_items_from_csv."""
     try:
-        with open(csv_file, 'r', newline='') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                # Helper function to safely convert to float or return default
-                def safe_float(value, default=None):
-                    if value and value.strip():
-                        return float(value)
-                    return default
-                
-                item = nutrition.Item(
-                    name=row['name'],
-                    item_type=row['type'],
-                    calories=float(row['calories']),
-                    weight=float(row['weight']),
-                    weight_unit=row['weight_unit'],
-                    min_protein=float(row['min_protein']),
-                    max_fiber=safe_float(row.get('max_fiber', ''), 0),
-                    min_fat=float(row['min_fat']),
-                    max_moisture=float(row['max_moisture']),
-                    ash=safe_float(row.get('ash', ''), 0),
-                    max_carbs=safe_float(row.get('max_carbs', ''), None)
-                )
-                items.append(item)
+        reader = csv.reader(_read_csv_text(csv_file))
+        header = next(reader, None)
+        if header is None:
+            return ()  # Empty file: no header and no items
+        column = {name: i for i, name in enumerate(header)}
+        
+        # Resolve column positions once. Optional columns that are absent
+        # point one past the header, which every row is padded to hold as ''.
+        width = len(header)
+        name_col = column['name']
+        type_col = column['type']
+        calories_col = column['calories']
+        weight_col = column['weight']
+        weight_unit_col = column['weight_unit']
+        protein_col = column['min_protein']
+        fiber_col = column.get('max_fiber', width)
+        fat_col = column['min_fat']
+        moisture_col = column['max_moisture']
+        ash_col = column.get('ash', width)
+        carbs_col = column.get('max_carbs', width)
+        
+        records = []
+        for row in reader:
+            if not row:
+                continue  # Skip blank lines like DictReader does
+            row += [''] * (width + 1 - len(row))
+            
+            records.append((
+                row[name_col],
+                row[type_col],
+                float(row[calories_col]),
+                float(row[weight_col]),
+                row[weight_unit_col],
+                float(row[protein_col]),
+                _safe_float(row[fiber_col], 0),
+                float(row[fat_col]),
+                float(row[moisture_col]),
+                _safe_float(row[ash_col], 0),
+                _safe_float(row[carbs_col], None)
+            ))
+        
+        # Convert all rows in one batch; columns follow Item.from_columns' parameter order
+        columns = zip(*records) if records else [()] * 11
+        items = nutrition.Item.from_columns(*columns)
     except FileNotFoundError:
         raise FileNotFoundError(f"CSV file not found: {csv_file}")
     except KeyError as e:
@@ -67,13 +112,33 @@ def load_items_from_csv(csv_file: str) -> List[nutrition.Item]:
     except ValueError as e:
         raise ValueError(f"Invalid value in CSV: {e}")
     
-    return items
+    return tuple(items)
+
+
+# Values that count as True for boolean config parameters
+_TRUE_VALUES = frozenset({'true', '1', 'yes', 't'})
+
+
+def _parse_bool(value: str) -> bool:
+    """Interpret a config value such as 'True', 'yes' or '1' as a boolean."""
+    return value.strip().lower() in _TRUE_VALUES
+
+
+# Type converters for known cat config parameters
+_CONFIG_CONVERTERS = {
+    'weight_kg': float,
+    'activity': int,
+    'neutered': _parse_bool,
+    'meal_count': int,
+}
 
 
 def load_cat_config(config_file: str = 'cat_config.csv') -> dict:
     """
     Load cat configuration parameters from CSV file.
     
+    The file is parsed once per path and cached; each call returns a new dict.
+    
     CSV format:
     parameter,value
     
@@ -93,27 +158,24 @@ def load_cat_config(config_file: str = 'cat_config.csv') -> dict:
         FileNotFoundError: If the config file doesn't exist
         ValueError: If the CSV format is invalid or required parameters are missing
     """
+    return dict(_read_cat_config(config_file))
+
+
+@functools.lru_cache(maxsize=None)
+def _read_cat_config(config_file: str) -> dict:
+    """Parse the cat config CSV once per path; see load_cat_config."""
     config = {}
     
     try:
-        with open(config_file, 'r', newline='') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                param = row['parameter']
-                value = row['value']
+        reader = csv.DictReader(_read_csv_text(config_file))
+        for row in reader:
+            param = row['parameter']
+            value = row['value']
+            
+            # Convert known parameter types; unknown parameters stay as strings
+            converter = _CONFIG_CONVERTERS.get(param)
+            config[param] = converter(value) if converter else value
                 
-                # Convert parameter types
-                if param == 'weight_kg':
-                    config[param] = float(value)
-                elif param == 'activity':
-                    config[param] = int(value)
-                elif param == 'neutered':
-                    config[param] = value.lower() in ('true', '1', 'yes', 't')
-                elif param == 'meal_count':
-                    config[param] = int(value)
-                else:
-                    config[param] = value
-                    
     except FileNotFoundError:
         raise FileNotFoundError(f"Config file not found: {config_file}")
     except KeyError as e:
@@ -126,6 +188,9 @@ def load_cat_config(config_file: str = 'cat_config.csv') -> dict:
 
 def main():
     """Interactive application entry point."""
+    # Only the interactive mode needs the UI module
+    import interactive
+    
     try:
         print("🐱 Cat Food Nutrition Optimizer")
         print("=" * 50)
@@ -5,12 +5,53 @@ This module provides functionality to calculate calorie requirements and
 determine optimal food quantities that meet specific macronutrient constraints.
 """
 
-from typing import List, Tuple
-from scipy.optimize import linprog, minimize
+import math
+from typing import List, Optional, Sequence, Tuple, Union
+from scipy import sparse
+from scipy.optimize import Bounds, linprog, minimize
 import numpy as np
 import config
 
 
+# Slack allowed on constraints when checking closed-form solutions
+_FEASIBILITY_TOLERANCE = 1e-9
+
+# linprog statuses worth one retry with relaxed tolerances
+# (1 = iteration limit reached, 4 = numerical difficulties)
+_RETRYABLE_LP_STATUSES = (1, 4)
+_RELAXED_HIGHS_OPTIONS = {
+    'presolve': True,
+    'primal_feasibility_tolerance': 1e-6,
+    'dual_feasibility_tolerance': 1e-6,
+}
+
+# Largest constraint violation for which the last point of a failed linprog
+# is used as-is instead of running the nonlinear fallback
+_LP_ACCEPT_TOLERANCE = 1e-6
+
+# When SLSQP stops with status 8 (line search failed), its point is still used
+# if it misses the calorie target by at most this fraction of the target and
+# no quantity is below -_SLSQP_STOP_TOLERANCE
+_SLSQP_STOP_TOLERANCE = 1e-6
+
+# Relaxed macronutrient limits (percentages) a treat substitution must meet
+_RELAXED_TARGETS = {
+    'protein': 40,  # Relaxed from 55
+    'carbs': 10,    # Relaxed from 2
+    'fat': 30       # Relaxed from 45
+}
+
+# Smallest treat amount that counts as included (displayed precision)
+_MIN_TREAT_OZ = 0.01
+
+# FoodBaskets built by calc_quant for item lists, keyed by item values
+_BASKET_CACHE = {}
+_BASKET_CACHE_SIZE = 32
+
+# Calorie multipliers indexed by activity level (1=low, 2=medium, 3=high)
+_ACTIVITY_MULTIPLIERS = (None, 1.2, 1.5, 2)
+
+
 class Item:
     """
     Represents a food item with nutritional information.
@@ -22,9 +63,11 @@ class Item:
         min_protein: Minimum protein percentage
         max_carbs: Calculated maximum carbohydrate percentage
         min_fat: Minimum fat percentage
-        is_dry_matter: Whether the item is dry (no moisture adjustment needed)
     """
     
+    # Fixed attribute set: no per-instance __dict__, faster attribute access
+    __slots__ = ('name', 'item_type', 'calories_per_oz', 'min_protein', 'max_carbs', 'min_fat')
+    
     def __init__(self, name: str, item_type: str, calories: float, weight: float, weight_unit: str, 
                  min_protein: float, max_fiber: float, min_fat: float, 
                  max_moisture: float, ash: float, max_carbs: float = None):
@@ -48,7 +91,8 @@ class Item:
             max_carbs: Optional carb percentage (as-fed from label). If None, will be calculated.
         
         Raises:
-            ValueError: If weight_unit is invalid, moisture >= 100, or item_type is invalid
+            ValueError: If weight_unit is invalid, weight is not positive, calories
+                per oz is not finite, moisture >= 100, or item_type is invalid
         """
         self.name = name
         self.item_type = item_type.lower()
@@ -56,18 +100,15 @@ class Item:
         if self.item_type not in ['food', 'treat']:
             raise ValueError(f"item_type must be 'food' or 'treat', got '{item_type}'")
         
-        # Normalize weight unit to lowercase
-        weight_unit_lower = weight_unit.lower()
-        
         # Convert weight to ounces
-        if weight_unit_lower not in config.WEIGHT_CONVERSION:
-            raise ValueError(f"Invalid weight unit: {weight_unit}. "
-                           f"Supported units: {list(config.WEIGHT_CONVERSION.keys())}")
-        
-        weight_in_ounces = weight * config.WEIGHT_CONVERSION[weight_unit_lower]
+        weight_in_ounces = config.to_oz(weight, weight_unit)
+        if not weight_in_ounces > 0:
+            raise ValueError(f"Weight must be positive, got {weight}")
         
         # Calculate calories per oz
         self.calories_per_oz = round(calories / weight_in_ounces, 2)
+        if not math.isfinite(self.calories_per_oz):
+            raise ValueError(f"Calories per oz must be finite, got {self.calories_per_oz}")
         
         # Calculate or use provided carbs
         if max_carbs is not None:
@@ -94,12 +135,268 @@ class Item:
             self.max_carbs = round((carbs_as_fed / dry_mass) * 100, 2)
             self.min_fat = round((min_fat / dry_mass) * 100, 2)
     
+    @classmethod
+    def from_columns(cls, names: Sequence[str], item_types: Sequence[str], calories: Sequence[float], 
+                     weights: Sequence[float], weight_units: Sequence[str], 
+                     min_protein: Sequence[float], max_fiber: Sequence[float], 
+                     min_fat: Sequence[float], max_moisture: Sequence[float], 
+                     ash: Sequence[float], max_carbs: Sequence[Optional[float]]) -> List['Item']:
+        """
+        Build many items at once from column data (e.g. a parsed CSV).
+        
+        Calorie density, carb calculation and dry matter conversion are done
+        with NumPy over whole columns instead of once per item. Values are
+        rounded with builtin round() like __init__, so they are the same as
+        constructing each Item individually. Each argument is a column
+        with one entry per item, with the same meaning as the matching __init__
+        argument; max_carbs entries may be None.
+        
+        Returns:
+            List of Item objects, in column order
+        
+        Raises:
+            ValueError: If any weight_unit is invalid, weight is not positive,
+                calories per oz is not finite, moisture >= 100, or item_type is invalid
+        """
+        normalized_types = [item_type.lower() for item_type in item_types]
+        for item_type, normalized in zip(item_types, normalized_types):
+            if normalized not in ['food', 'treat']:
+                raise ValueError(f"item_type must be 'food' or 'treat', got '{item_type}'")
+        
+        weight_in_ounces = np.array([config.to_oz(weight, weight_unit)
+                                     for weight, weight_unit in zip(weights, weight_units)],
+                                    dtype=np.float64)
+        # Reject the same rows as __init__, before dividing
+        invalid = ~(weight_in_ounces > 0)
+        if invalid.any():
+            raise ValueError(f"Weight must be positive, got {weights[int(np.argmax(invalid))]}")
+        calories_per_oz = np.asarray(calories, dtype=np.float64) / weight_in_ounces
+        invalid = ~np.isfinite(calories_per_oz)
+        if invalid.any():
+            raise ValueError(f"Calories per oz must be finite, got {calories_per_oz[invalid][0]}")
+        
+        protein = np.asarray(min_protein, dtype=np.float64)
+        fat = np.asarray(min_fat, dtype=np.float64)
+        moisture = np.asarray(max_moisture, dtype=np.float64)
+        if (moisture >= 100).any():
+            raise ValueError("Moisture cannot be 100% or greater")
+        
+        # Use provided carbs where present (None becomes NaN), else the PetMD formula³
+        provided_carbs = np.array(max_carbs, dtype=np.float64)
+        calculated_carbs = 100 - (protein + fat + np.asarray(max_fiber, dtype=np.float64) +
+                                  moisture + np.asarray(ash, dtype=np.float64))
+        carbs_as_fed = np.where(np.isnan(provided_carbs), calculated_carbs, provided_carbs)
+        
+        # Convert to dry matter basis with the same operations as __init__,
+        # leaving rows with 0 moisture (already dry matter) unchanged
+        dry_mass = 100 - moisture
+        is_dry = moisture == 0
+        dry_protein = np.where(is_dry, protein, (protein / dry_mass) * 100)
+        dry_carbs = np.where(is_dry, carbs_as_fed, (carbs_as_fed / dry_mass) * 100)
+        dry_fat = np.where(is_dry, fat, (fat / dry_mass) * 100)
+        
+        # Bypass __init__, rounding with builtin round() as it does; np.round
+        # can differ from it in the last digit on rounding ties
+        items = []
+        for name, item_type, cal, prot, carbs, fat_value in zip(
+                names, normalized_types, calories_per_oz.tolist(),
+                dry_protein.tolist(), dry_carbs.tolist(), dry_fat.tolist()):
+            item = cls.__new__(cls)
+            item.name = name
+            item.item_type = item_type
+            item.calories_per_oz = round(cal, 2)
+            item.min_protein = round(prot, 2)
+            item.max_carbs = round(carbs, 2)
+            item.min_fat = round(fat_value, 2)
+            items.append(item)
+        return items
+    
     def __repr__(self):
         return (f"Item(name='{self.name}', type='{self.item_type}', calories_per_oz={self.calories_per_oz}, "
                 f"min_protein={self.min_protein}, max_carbs={self.max_carbs}, "
                 f"min_fat={self.min_fat})")
 
 
+class FoodBasket:
+    """
+    Struct-of-arrays view of a list of items, built once and reused across solves.
+    
+    Pass a FoodBasket to calc_quant instead of a list when solving the same
+    items repeatedly (e.g. for different calorie targets) so item attributes
+    are only extracted once.
+    
+    Attributes:
+        items: The Item objects, in order
+        names: Item names, in order
+        calories_per_oz: Calories per ounce of each item (float64 array)
+        min_protein: Dry matter protein percentage of each item (float64 array)
+        max_carbs: Dry matter carbohydrate percentage of each item (float64 array)
+        min_fat: Dry matter fat percentage of each item (float64 array)
+        is_treat: Whether each item is a treat (boolean array)
+        treat_calories_per_oz: calories_per_oz for treats, 0 for food (float64 array)
+    """
+    
+    def __init__(self, items: List[Item]):
+        """
+        Build the array view of the given items.
+        
+        Args:
+            items: List of Item objects
+        """
+        self.items = list(items)
+        self.names = [item.name for item in self.items]
+        (self.calories_per_oz, self.min_protein, self.max_carbs, 
+         self.min_fat, self.is_treat) = _items_to_arrays(self.items)
+        self.treat_calories_per_oz = np.where(self.is_treat, self.calories_per_oz, 0.0)
+        self._standard_lp = None
+        self._substitution_lp = None
+        # Set once linprog proves the standard LP infeasible. Its constraints
+        # scale with the calorie target, so that holds for every target.
+        self._standard_lp_infeasible = False
+    
+    def _standard_lp_matrices(self) -> Tuple[np.ndarray, sparse.csr_matrix, sparse.csr_matrix]:
+        """
+        Constraint matrices of the standard LP, built on first use.
+        
+        Only the right-hand sides of the LP depend on the calorie target, so
+        repeated solves on the same basket reuse these matrices. Macronutrient
+        targets are read from config when they are first built.
+        
+        Returns:
+            Tuple of (inequality matrix, inequality matrix as CSR, calorie
+            equality row as CSR)
+        """
+        if self._standard_lp is None:
+            constraint_matrix = _standard_constraint_matrix(self.calories_per_oz, self.min_protein, 
+                                                            self.max_carbs, self.min_fat, 
+                                                            self.is_treat)
+            # CSR lets HiGHS take the matrices as-is instead of converting dense input
+            self._standard_lp = (constraint_matrix, sparse.csr_matrix(constraint_matrix), 
+                                 sparse.csr_matrix(self.calories_per_oz[np.newaxis, :]))
+            if _has_unsatisfiable_row(constraint_matrix, self.calories_per_oz):
+                self._standard_lp_infeasible = True
+        return self._standard_lp
+    
+    def _substitution_lp_matrices(self) -> Tuple[sparse.csr_matrix, sparse.csr_matrix]:
+        """
+        Constraint matrices of the treat substitution LP, built on first use.
+        
+        Returns:
+            Tuple of (inequality matrix as CSR, calorie equality row as CSR)
+        """
+        if self._substitution_lp is None:
+            constraint_matrix = _relaxed_constraint_matrix(self.calories_per_oz, self.min_protein, 
+                                                           self.max_carbs, self.min_fat, 
+                                                           self.is_treat)
+            self._substitution_lp = (sparse.csr_matrix(constraint_matrix), 
+                                     self._standard_lp_matrices()[2])
+        return self._substitution_lp
+    
+    def __len__(self):
+        return len(self.items)
+    
+    def __repr__(self):
+        return f"FoodBasket(names={self.names})"
+
+
+def _items_to_arrays(items: List[Item]) -> Tuple[np.ndarray, ...]:
+    """
+    Extract item attributes into contiguous NumPy arrays (struct-of-arrays layout).
+    
+    Args:
+        items: List of Item objects
+    
+    Returns:
+        Tuple of (calories_per_oz, min_protein, max_carbs, min_fat, is_treat),
+        each of shape (len(items),). is_treat is boolean, the others float64.
+    """
+    values = np.array([(item.calories_per_oz, item.min_protein, item.max_carbs, item.min_fat)
+                       for item in items], dtype=np.float64).reshape(-1, 4)
+    calories_per_oz, min_protein, max_carbs, min_fat = np.ascontiguousarray(values.T)
+    is_treat = np.fromiter((item.item_type == 'treat' for item in items), dtype=bool, count=len(items))
+    return calories_per_oz, min_protein, max_carbs, min_fat, is_treat
+
+
+def _standard_constraint_matrix(calories_per_oz: np.ndarray, min_protein: np.ndarray, 
+                               max_carbs: np.ndarray, min_fat: np.ndarray, 
+                               is_treat: np.ndarray) -> np.ndarray:
+    """
+    Build the inequality constraint matrix (A_ub) of the standard LP.
+    
+    Each row is filled in place in a preallocated array:
+    0. Max carbs (adjusted for crude fiber overestimation) <= target
+    1. Min protein >= target
+    2. Min fat >= target
+    3. Treat calories <= 10% of total calories
+    
+    Args:
+        calories_per_oz, min_protein, max_carbs, min_fat, is_treat: Arrays from _items_to_arrays
+    
+    Returns:
+        Array of shape (4, num_items)
+    """
+    targets = config.MACRONUTRIENT_TARGETS
+    matrix = np.empty((4, len(calories_per_oz)))
+    
+    np.multiply(max_carbs, 1 - config.CARB_OVERESTIMATION_FACTOR, out=matrix[0])
+    matrix[0] -= targets['carbs']
+    np.subtract(targets['protein'], min_protein, out=matrix[1])
+    np.subtract(targets['fat'], min_fat, out=matrix[2])
+    np.multiply(calories_per_oz, is_treat, out=matrix[3])
+    
+    return matrix
+
+
+def _has_unsatisfiable_row(constraint_matrix: np.ndarray, calories_per_oz: np.ndarray) -> bool:
+    """
+    Cheap sufficient test for infeasibility of the standard LP.
+    
+    With the calorie equality substituted into the treat row, every row reads
+    row @ quantities <= 0. Non-negative quantities can't satisfy a row whose
+    entries are all positive, e.g. when no item reaches the fat target or
+    every item is a treat.
+    
+    Args:
+        constraint_matrix: Dense standard inequality matrix (see _standard_constraint_matrix)
+        calories_per_oz: Calories per ounce of each item
+    
+    Returns:
+        True if some row is violated by every item, so the LP is infeasible
+    """
+    if (constraint_matrix[:3].min(axis=1) > 0).any():
+        return True
+    return bool(((constraint_matrix[3] - 0.1 * calories_per_oz) > 0).all())
+
+
+def _relaxed_constraint_matrix(calories_per_oz: np.ndarray, min_protein: np.ndarray, 
+                              max_carbs: np.ndarray, min_fat: np.ndarray, 
+                              is_treat: np.ndarray) -> np.ndarray:
+    """
+    Build the inequality constraint matrix (A_ub) of the treat substitution LP.
+    
+    Same layout as _standard_constraint_matrix, against _RELAXED_TARGETS:
+    0. Max carbs (adjusted for crude fiber overestimation) <= relaxed target
+    1. Min protein >= relaxed target
+    2. Min fat >= relaxed target
+    3. Treat calories <= 10% of total calories
+    
+    Args:
+        calories_per_oz, min_protein, max_carbs, min_fat, is_treat: Arrays from _items_to_arrays
+    
+    Returns:
+        Array of shape (4, num_items)
+    """
+    matrix = np.empty((4, len(calories_per_oz)))
+    
+    np.multiply(max_carbs, 1 - config.CARB_OVERESTIMATION_FACTOR, out=matrix[0])
+    matrix[0] -= _RELAXED_TARGETS['carbs']
+    np.subtract(_RELAXED_TARGETS['protein'], min_protein, out=matrix[1])
+    np.subtract(_RELAXED_TARGETS['fat'], min_fat, out=matrix[2])
+    np.multiply(calories_per_oz, is_treat, out=matrix[3])
+    
+    return matrix
+
+
 def calc_cal(weight_kg: float, activity: int, neutered: bool, meal_count: int) -> float:
     """
     Calculate daily calorie requirement per meal.
@@ -114,21 +411,58 @@ def calc_cal(weight_kg: float, activity: int, neutered: bool, meal_count: int) -
         Calories required per meal
     
     Raises:
-        KeyError: If activity level is not 1, 2, or 3
+        ValueError: If activity level is not 1, 2, or 3
     """
-    activity_multipliers = {1: 1.2, 2: 1.5, 3: 2}
-    
-    if activity not in activity_multipliers:
+    if activity not in (1, 2, 3):
         raise ValueError(f"Activity level must be 1, 2, or 3, got {activity}")
     
-    resting_energy_requirement = ((30 * weight_kg) + 70) * activity_multipliers[activity]
+    resting_energy_requirement = ((30 * weight_kg) + 70) * _ACTIVITY_MULTIPLIERS[int(activity)]
     if neutered:
         resting_energy_requirement *= 0.8
     
     return round(resting_energy_requirement / meal_count, 2)
 
 
-def calc_quant(items: List[Item], total_calories: float, include_treat: bool = False) -> List[Tuple[str, float]]:
+def calc_cal_batch(weights_kg: Sequence[float], activities: Sequence[int], 
+                   neutered: Sequence[bool], meal_counts: Sequence[int]) -> np.ndarray:
+    """
+    Calculate calorie requirements per meal for many cats at once.
+    
+    Vectorized calc_cal: each argument holds one entry per cat (scalars are
+    broadcast), and the arithmetic runs as NumPy array operations. Results are
+    rounded with builtin round() like calc_cal, so each entry equals the
+    matching calc_cal result.
+    
+    Args:
+        weights_kg: Body weights in kilograms
+        activities: Activity levels (1=low, 2=medium, 3=high)
+        neutered: Whether each cat is neutered (applies 0.8 multiplier)
+        meal_counts: Number of meals per day
+    
+    Returns:
+        Array of calories required per meal, rounded to 2 decimals
+    
+    Raises:
+        ValueError: If any activity level is not 1, 2, or 3
+    """
+    activities = np.asarray(activities)
+    invalid = ~np.isin(activities, (1, 2, 3))
+    if invalid.any():
+        raise ValueError(f"Activity level must be 1, 2, or 3, got {activities[invalid].flat[0]}")
+    
+    multipliers = np.array(_ACTIVITY_MULTIPLIERS[1:])[activities.astype(np.intp) - 1]
+    resting_energy_requirement = ((30 * np.asarray(weights_kg, dtype=np.float64)) + 70) * multipliers
+    resting_energy_requirement = np.where(neutered, resting_energy_requirement * 0.8, 
+                                          resting_energy_requirement)
+    
+    # np.round can differ from round() in the last digit on rounding ties
+    per_meal = resting_energy_requirement / np.asarray(meal_counts)
+    rounded = [round(calories, 2) for calories in per_meal.ravel().tolist()]
+    return np.array(rounded, dtype=np.float64).reshape(per_meal.shape)
+
+
+def calc_quant(items: Union[List[Item], FoodBasket], total_calories: float, 
+               include_treat: bool = False) -> List[Tuple[str, float]]:
     """
     Calculate optimal quantities of items to meet calorie and macronutrient targets.
     
@@ -145,7 +479,7 @@ def calc_quant(items: List[Item], total_calories: float, include_treat: bool = F
     - At least one treat included (if include_treat=True)
     
     Args:
-        items: List of Item objects to choose from
+        items: List of Item objects to choose from, or a prebuilt FoodBasket
         total_calories: Target total calories
         include_treat: If True, ensures at least one treat is included
     
@@ -161,67 +495,250 @@ def calc_quant(items: List[Item], total_calories: float, include_treat: bool = F
     if total_calories <= 0:
         raise ValueError(f"total_calories must be positive, got {total_calories}")
     
+    basket = items if isinstance(items, FoodBasket) else _basket_for(items)
+    
     # Stage 1: Try standard optimization without treat inclusion constraint
-    result = _optimize_standard(items, total_calories)
+    quantities = _optimize_standard(basket, total_calories)
+    if quantities is None:
+        return []
+    
+    # Solvers work at full precision; later stages start from the rounded quantities
+    quantities = np.round(quantities, 2)
     
-    # Stage 2: If treat inclusion is requested, try to include treats
-    if include_treat and result:
-        result_with_treats = _optimize_with_treat_inclusion(items, total_calories, result)
-        if result_with_treats:
-            return result_with_treats
+    # Stage 2: If treat inclusion is requested, try to include treats (if there are any)
+    if include_treat and basket.is_treat.any():
+        quantities_with_treats = _optimize_with_treat_inclusion(basket, total_calories, quantities)
+        if quantities_with_treats is not None:
+            quantities = quantities_with_treats
     
-    return result
+    return _round_result(basket.names, quantities)
 
 
-def _optimize_standard(items: List[Item], total_calories: float) -> List[Tuple[str, float]]:
+def calc_quant_batch(items: Union[List[Item], FoodBasket], total_calories: Sequence[float], 
+                     include_treat: bool = False) -> List[List[Tuple[str, float]]]:
     """
-    Standard optimization without treat inclusion constraints.
+    Calculate optimal quantities of the same items for several calorie targets.
+    
+    Equivalent to calling calc_quant once per target, but the items are
+    converted to a FoodBasket once and its LP matrices are shared by every
+    solve. If the standard LP turns out to be infeasible for one target it
+    is infeasible for all of them, so linprog only runs until that is known.
+    
+    Args:
+        items: List of Item objects to choose from, or a prebuilt FoodBasket
+        total_calories: Target total calories, one per solve
+        include_treat: If True, ensures at least one treat is included
+    
+    Returns:
+        One calc_quant result per calorie target, in order
+    
+    Raises:
+        ValueError: If items list is empty or any total_calories <= 0
+    """
+    if not items:
+        raise ValueError("Items list cannot be empty")
+    total_calories = np.asarray(total_calories, dtype=np.float64).ravel()
+    invalid = total_calories <= 0
+    if invalid.any():
+        raise ValueError(f"total_calories must be positive, got {total_calories[invalid][0]}")
+    
+    basket = items if isinstance(items, FoodBasket) else _basket_for(items)
+    return [calc_quant(basket, calories, include_treat) for calories in total_calories.tolist()]
+
+
+def _basket_for(items: List[Item]) -> FoodBasket:
+    """
+    Return a FoodBasket for the items, reusing one built for equal items.
+    
+    Callers that pass the same item list to calc_quant with different
+    calorie targets then reuse the basket's arrays and cached LP matrices.
+    Baskets are keyed on item values and the config targets, so changed
+    items or targets get a new basket.
     
     Args:
         items: List of Item objects
+    
+    Returns:
+        FoodBasket of the items
+    """
+    key = (_penalty_targets(), 
+           tuple((item.name, item.item_type, item.calories_per_oz, item.min_protein, 
+                  item.max_carbs, item.min_fat) for item in items))
+    basket = _BASKET_CACHE.get(key)
+    if basket is None:
+        # Evict the oldest entry once full
+        if len(_BASKET_CACHE) >= _BASKET_CACHE_SIZE:
+            del _BASKET_CACHE[next(iter(_BASKET_CACHE))]
+        basket = _BASKET_CACHE[key] = FoodBasket(items)
+    return basket
+
+
+def _round_result(names: List[str], quantities: np.ndarray) -> List[Tuple[str, float]]:
+    """
+    Pair item names with their quantities rounded to 2 decimals.
+    
+    This is the only place results are converted to Python objects; everything
+    before it works on quantity arrays in basket order.
+    
+    Args:
+        names: Item names, in order
+        quantities: Unrounded quantity of each item in ounces
+    
+    Returns:
+        List of tuples [(item_name, quantity_in_oz), ...]
+    """
+    return list(zip(names, np.round(quantities, 2).tolist()))
+
+
+def _optimize_standard(basket: FoodBasket, total_calories: float) -> Optional[np.ndarray]:
+    """
+    Standard optimization without treat inclusion constraints.
+    
+    Args:
+        basket: FoodBasket of the items to choose from
         total_calories: Target calories
     
     Returns:
-        List of tuples [(item_name, quantity_in_oz), ...] or empty list if no solution
+        Unrounded quantity of each item in ounces, or None if no solution
     """
-    num_items = len(items)
+    num_items = len(basket)
+    calories_per_oz = basket.calories_per_oz
+    
+    # Standard constraints (no treat inclusion); only the bounds depend on calories
+    constraint_matrix, inequality_constraints, equality_constraints = basket._standard_lp_matrices()
+    inequality_bounds = np.array([0, 0, 0, total_calories * 0.1])
+    
+    # One or two items can be solved directly without setting up the LP
+    if num_items <= 2:
+        quantities = _solve_small_standard(calories_per_oz, constraint_matrix, 
+                                           inequality_bounds, total_calories)
+        if quantities is not None:
+            return quantities
+    
+    # Non-negative bounds, given as arrays rather than one tuple per item
+    bounds = Bounds(np.zeros(num_items), np.inf)
+    
+    # Infeasibility doesn't depend on the calorie target; go straight to the fallback
+    if basket._standard_lp_infeasible:
+        return _find_best_approximation(basket, total_calories, bounds, num_items, False)
     
     # Objective: minimize total quantity
-    objective_vector = [1] * num_items
-    
-    # Standard constraints (no treat inclusion)
-    inequality_constraints = [
-        [(item.max_carbs * (1 - config.CARB_OVERESTIMATION_FACTOR) - config.MACRONUTRIENT_TARGETS['carbs']) 
-         for item in items],  # Max carbs
-        [-(item.min_protein - config.MACRONUTRIENT_TARGETS['protein']) for item in items],  # Min protein
-        [-(item.min_fat - config.MACRONUTRIENT_TARGETS['fat']) for item in items],  # Min fat
-        # Treat constraint: treats <= 10% of total calories
-        [item.calories_per_oz if item.item_type == 'treat' else 0 for item in items]
-    ]
-    inequality_bounds = [0, 0, 0, total_calories * 0.1]
+    objective_vector = np.ones(num_items)
     
     # Equality constraint: total calories
-    equality_constraints = [[item.calories_per_oz for item in items]]
-    equality_bounds = [total_calories]
-    
-    # Non-negative bounds
-    bounds = [(0, None) for _ in range(num_items)]
+    equality_bounds = np.array([total_calories])
     
     # Try linear programming
     linear_result = linprog(objective_vector, A_ub=inequality_constraints, 
                            b_ub=inequality_bounds, A_eq=equality_constraints, 
-                           b_eq=equality_bounds, bounds=bounds, method='highs')
+                           b_eq=equality_bounds, bounds=(0, None), method='highs')
+    
+    # An iteration limit or numerical trouble doesn't mean the LP is infeasible;
+    # retrying with relaxed tolerances is much cheaper than the nonlinear fallback
+    if linear_result.status in _RETRYABLE_LP_STATUSES:
+        linear_result = linprog(objective_vector, A_ub=inequality_constraints, 
+                               b_ub=inequality_bounds, A_eq=equality_constraints, 
+                               b_eq=equality_bounds, bounds=(0, None), method='highs', 
+                               options=_RELAXED_HIGHS_OPTIONS)
     
     if linear_result.success:
-        return [(items[i].name, round(float(linear_result.x[i]), 2)) 
-                for i in range(num_items)]
+        return linear_result.x
+    if linear_result.status == 2:
+        basket._standard_lp_infeasible = True
+    
+    # A run that stopped early (e.g. at the iteration limit) may still have
+    # reached a feasible point, which is good enough without SLSQP
+    if (linear_result.x is not None and 
+            _constraint_violation(linear_result.x, constraint_matrix, inequality_bounds, 
+                                  calories_per_oz, total_calories) <= _LP_ACCEPT_TOLERANCE):
+        return linear_result.x
+    
+    # Fallback to nonlinear optimization, starting from HiGHS' last point if it
+    # reported one (it does not for infeasible models)
+    return _find_best_approximation(basket, total_calories, bounds, num_items, False, 
+                                    initial_guess=linear_result.x)
+
+
+def _constraint_violation(quantities: np.ndarray, constraint_matrix: np.ndarray, 
+                          inequality_bounds: np.ndarray, calories_per_oz: np.ndarray, 
+                          total_calories: float) -> float:
+    """
+    Largest violation of the standard LP constraints at the given quantities.
+    
+    Args:
+        quantities: Quantity of each item in ounces
+        constraint_matrix: Dense standard inequality matrix (see _standard_constraint_matrix)
+        inequality_bounds: Right-hand sides of the inequality rows
+        calories_per_oz: Calories per ounce of each item
+        total_calories: Target calories
+    
+    Returns:
+        Largest amount by which an inequality, the calorie equality or a
+        non-negativity bound is violated (0 if all hold); inf if any quantity
+        is not finite
+    """
+    if not np.isfinite(quantities).all():
+        return np.inf
+    return max((constraint_matrix @ quantities - inequality_bounds).max(), 
+               abs(quantities @ calories_per_oz - total_calories), 
+               -quantities.min(), 0.0)
+
+
+def _solve_small_standard(calories_per_oz: np.ndarray, constraint_matrix: np.ndarray, 
+                          inequality_bounds: np.ndarray, 
+                          total_calories: float) -> Optional[np.ndarray]:
+    """
+    Solve the standard LP in closed form for one or two items.
+    
+    With one item the calorie equality fixes the quantity. With two items it
+    leaves one free variable t (q1 = t, q2 = (total_calories - c1*t) / c2), so
+    every inequality becomes a bound on t and the optimum of the linear
+    objective is an end of the resulting interval.
     
-    # Fallback to nonlinear optimization
-    return _find_best_approximation(items, total_calories, bounds, num_items, False)
+    Args:
+        calories_per_oz: Calories per ounce of each item
+        constraint_matrix: Inequality matrix from _standard_constraint_matrix
+        inequality_bounds: Right-hand sides of the inequality constraints
+        total_calories: Target calories
+    
+    Returns:
+        Array of optimal quantities, or None if the problem is infeasible or
+        has items without calories (left to linprog to decide)
+    """
+    if np.any(calories_per_oz <= 0):
+        return None
+    
+    if len(calories_per_oz) == 1:
+        quantity = total_calories / calories_per_oz[0]
+        if np.all(constraint_matrix[:, 0] * quantity <= inequality_bounds + _FEASIBILITY_TOLERANCE):
+            return np.array([quantity])
+        return None
+    
+    first_calories, second_calories = calories_per_oz
+    ratio = first_calories / second_calories
+    slopes = constraint_matrix[:, 0] - constraint_matrix[:, 1] * ratio
+    limits = inequality_bounds - constraint_matrix[:, 1] * (total_calories / second_calories)
+    
+    # Feasible interval for t, starting from both quantities being non-negative
+    lower, upper = 0.0, total_calories / first_calories
+    for slope, limit in zip(slopes.tolist(), limits.tolist()):
+        if slope > 0:
+            upper = min(upper, limit / slope)
+        elif slope < 0:
+            lower = max(lower, limit / slope)
+        elif limit < -_FEASIBILITY_TOLERANCE:
+            return None
+    if lower > upper + _FEASIBILITY_TOLERANCE:
+        return None
+    
+    # Total quantity is t + q2, whose slope in t is 1 - c1/c2
+    t = lower if ratio <= 1 else upper
+    t = min(max(t, 0.0), total_calories / first_calories)
+    return np.array([t, (total_calories - first_calories * t) / second_calories])
 
 
-def _optimize_with_treat_inclusion(items: List[Item], total_calories: float, 
-                                  base_result: List[Tuple[str, float]]) -> List[Tuple[str, float]]:
+def _optimize_with_treat_inclusion(basket: FoodBasket, total_calories: float, 
+                                  base_quantities: np.ndarray) -> Optional[np.ndarray]:
     """
     Optimize to include treats while maintaining good nutrition.
     
@@ -231,321 +748,275 @@ def _optimize_with_treat_inclusion(items: List[Item], total_calories: float,
     3. Use flexible optimization to balance nutrition and treat inclusion
     
     Args:
-        items: List of Item objects
+        basket: FoodBasket of the items to choose from
         total_calories: Target calories
-        base_result: Base optimization result
+        base_quantities: Base optimization result, rounded, in basket order
     
     Returns:
-        List of tuples [(item_name, quantity_in_oz), ...] or empty list if no improvement
+        Quantity of each item in ounces, or None if no improvement
     """
     # Check if base result already includes treats
-    treats_in_base = [name for name, qty in base_result if qty > 0 and 
-                     any(item.name == name and item.item_type == 'treat' for item in items)]
+    if (base_quantities[basket.is_treat] > 0).any():
+        return base_quantities  # Already includes treats
     
-    if treats_in_base:
-        return base_result  # Already includes treats
-    
-    # Try greedy substitution approach
-    substitution_result = _greedy_treat_substitution(items, total_calories, base_result)
-    if substitution_result:
-        return substitution_result
+    # Try substituting food with treats
+    substitution_quantities = _treat_substitution(basket, total_calories, base_quantities)
+    if substitution_quantities is not None:
+        return substitution_quantities
     
     # Fall back to simple treat addition
-    return _simple_treat_addition(items, total_calories, base_result)
+    return _simple_treat_addition(basket, total_calories, base_quantities)
 
 
-def _greedy_treat_substitution(items: List[Item], total_calories: float, 
-                              base_result: List[Tuple[str, float]]) -> List[Tuple[str, float]]:
+def _treat_substitution(basket: FoodBasket, total_calories: float, 
+                        base_quantities: np.ndarray) -> Optional[np.ndarray]:
     """
-    Try to substitute some food with treats using a greedy approach.
+    Substitute food with treats by solving one LP over all treats.
+    
+    Maximizes total treat quantity while:
+    - Total calories equal target
+    - Weighted average nutrition stays within the relaxed limits
+      (_RELAXED_TARGETS: protein >= 40%, carbs <= 10%, fat >= 30%)
+    - Treats stay within 10% of total calories
+    - Food quantities only decrease from the base result
     
     Args:
-        items: List of Item objects
+        basket: FoodBasket of the items to choose from
         total_calories: Target calories
-        base_result: Base optimization result
+        base_quantities: Base optimization result, rounded, in basket order
     
     Returns:
-        List of tuples [(item_name, quantity_in_oz), ...] or empty list if no improvement
+        Quantity of each item in ounces, rounded to 2 decimals, or None if no
+        treat can be substituted
     """
-    # Get available treats
-    treats = [item for item in items if item.item_type == 'treat']
-    if not treats:
-        return []
+    is_treat = basket.is_treat
+    
+    # Objective: maximize total treat quantity
+    objective_vector = -is_treat.astype(np.float64)
     
-    # Find the best treat to substitute
-    best_treat = None
-    best_substitution = None
+    # Relaxed nutrition rows and the treat calorie row, each <= bound
+    inequality_constraints, equality_constraints = basket._substitution_lp_matrices()
+    inequality_bounds = np.array([0, 0, 0, total_calories * 0.1])
     
-    for treat in treats:
-        # Try substituting a small amount of food with this treat
-        substitution_result = _try_treat_substitution(items, total_calories, base_result, treat)
-        if substitution_result:
-            if not best_substitution or _is_better_substitution(substitution_result, best_substitution):
-                best_treat = treat
-                best_substitution = substitution_result
+    # Treats are unbounded above; food can only be reduced
+    bounds = np.column_stack((np.zeros(len(basket)), np.where(is_treat, np.inf, base_quantities)))
     
-    return best_substitution
+    linear_result = linprog(objective_vector, A_ub=inequality_constraints, 
+                           b_ub=inequality_bounds, A_eq=equality_constraints, 
+                           b_eq=np.array([total_calories]), bounds=bounds, method='highs')
+    if not linear_result.success:
+        return None
+    
+    quantities = np.round(linear_result.x, 2)
+    if not (quantities[is_treat] >= _MIN_TREAT_OZ).any():
+        return None
+    return quantities
 
 
-def _try_treat_substitution(items: List[Item], total_calories: float, 
-                           base_result: List[Tuple[str, float]], treat: Item) -> List[Tuple[str, float]]:
-    """
-    Try substituting a small amount of food with a specific treat.
-    
-    Args:
-        items: List of Item objects
-        total_calories: Target calories
-        base_result: Base optimization result
-        treat: Treat item to substitute with
-    
-    Returns:
-        List of tuples [(item_name, quantity_in_oz), ...] or empty list if substitution fails
-    """
-    # Calculate how much treat we can add (up to 10% of calories)
-    max_treat_calories = total_calories * 0.1
-    max_treat_oz = max_treat_calories / treat.calories_per_oz
-    
-    # Try different treat amounts
-    for treat_oz in [0.01, 0.02, 0.05, max_treat_oz]:
-        if treat_oz > max_treat_oz:
-            break
-            
-        treat_calories = treat_oz * treat.calories_per_oz
-        
-        # Find food items to reduce
-        food_items = [(name, qty) for name, qty in base_result if qty > 0 and 
-                     any(item.name == name and item.item_type == 'food' for item in items)]
-        
-        if not food_items:
-            continue
-            
-        # Try to reduce the food item with lowest calories per oz
-        food_items.sort(key=lambda x: next(item.calories_per_oz for item in items if item.name == x[0]))
-        
-        for food_name, food_qty in food_items:
-            food_item = next(item for item in items if item.name == food_name)
-            food_calories_per_oz = food_item.calories_per_oz
-            
-            # Calculate how much food to reduce
-            food_reduction_oz = treat_calories / food_calories_per_oz
-            
-            if food_reduction_oz >= food_qty:
-                continue  # Can't reduce more than available
-            
-            # Create new result with substitution
-            new_result = []
-            substitution_made = False
-            
-            for name, qty in base_result:
-                if name == food_name and not substitution_made:
-                    new_result.append((name, qty - food_reduction_oz))
-                    substitution_made = True
-                else:
-                    new_result.append((name, qty))
-            
-            # Add treat
-            treat_found = False
-            for name, qty in new_result:
-                if name == treat.name:
-                    treat_found = True
-                    break
-            
-            if not treat_found:
-                new_result.append((treat.name, treat_oz))
-            
-            # Check if this substitution maintains good nutrition
-            if _is_valid_substitution(items, new_result, total_calories):
-                return new_result
-    
-    return []
-
-
-def _is_better_substitution(result1: List[Tuple[str, float]], result2: List[Tuple[str, float]]) -> bool:
-    """Check if result1 is better than result2 for treat inclusion."""
-    # Prefer results with more treat quantity
-    treat_qty1 = sum(qty for name, qty in result1 if any(item.name == name and item.item_type == 'treat' for item in items))
-    treat_qty2 = sum(qty for name, qty in result2 if any(item.name == name and item.item_type == 'treat' for item in items))
-    
-    return treat_qty1 > treat_qty2
-
-
-def _is_valid_substitution(items: List[Item], result: List[Tuple[str, float]], total_calories: float) -> bool:
-    """Check if a substitution result maintains reasonable nutrition."""
-    # Calculate macronutrient ratios
-    total_oz = sum(qty for _, qty in result)
-    if total_oz <= 0:
-        return False
-    
-    weighted_protein = sum(qty * next(item.min_protein for item in items if item.name == name) 
-                          for name, qty in result) / total_oz
-    weighted_carbs = sum(qty * next(item.max_carbs for item in items if item.name == name) 
-                        for name, qty in result) / total_oz
-    weighted_fat = sum(qty * next(item.min_fat for item in items if item.name == name) 
-                      for name, qty in result) / total_oz
-    
-    # Check if nutrition is still reasonable (relaxed constraints)
-    adjusted_carbs = weighted_carbs * (1 - config.CARB_OVERESTIMATION_FACTOR)
-    
-    return (weighted_protein >= 40 and  # Relaxed from 55
-            adjusted_carbs <= 10 and   # Relaxed from 2
-            weighted_fat >= 30)        # Relaxed from 45
-
-
-def _simple_treat_addition(items: List[Item], total_calories: float, 
-                          base_result: List[Tuple[str, float]]) -> List[Tuple[str, float]]:
+def _simple_treat_addition(basket: FoodBasket, total_calories: float, 
+                          base_quantities: np.ndarray) -> Optional[np.ndarray]:
     """
     Simple approach: add a small amount of the best treat.
     
     Args:
-        items: List of Item objects
+        basket: FoodBasket of the items to choose from
         total_calories: Target calories
-        base_result: Base optimization result
+        base_quantities: Base optimization result, rounded, in basket order
     
     Returns:
-        List of tuples [(item_name, quantity_in_oz), ...] or empty list if addition fails
+        Quantity of each item in ounces, or None if addition fails
     """
     # Get available treats
-    treats = [item for item in items if item.item_type == 'treat']
-    if not treats:
-        return []
+    treats = np.flatnonzero(basket.is_treat)
+    if not treats.size:
+        return None
     
-    # Find the treat with best macronutrient profile
-    best_treat = min(treats, key=lambda t: t.max_carbs)  # Lowest carbs
+    # Find the treat with best macronutrient profile (lowest carbs, first one on ties)
+    best_treat = treats[np.argmin(basket.max_carbs[treats])]
     
     # Add a small amount (0.01 oz)
     treat_oz = 0.01
-    treat_calories = treat_oz * best_treat.calories_per_oz
+    treat_calories = treat_oz * basket.calories_per_oz[best_treat]
     
     # Check if this exceeds treat limit
     if treat_calories > total_calories * 0.1:
-        return []
+        return None
     
     # Create new result with treat added
-    new_result = base_result.copy()
-    
-    # Check if treat is already in result
-    treat_found = False
-    for i, (name, qty) in enumerate(new_result):
-        if name == best_treat.name:
-            new_result[i] = (name, qty + treat_oz)
-            treat_found = True
-            break
-    
-    if not treat_found:
-        new_result.append((best_treat.name, treat_oz))
+    quantities = base_quantities.copy()
+    quantities[best_treat] += treat_oz
     
     # Reduce a food item to compensate for calories
-    food_items = [(name, qty) for name, qty in new_result if qty > 0 and 
-                 any(item.name == name and item.item_type == 'food' for item in items)]
-    
-    if not food_items:
-        return []
+    foods = np.flatnonzero(~basket.is_treat & (quantities > 0))
+    if not foods.size:
+        return None
     
-    # Reduce the food item with highest calories per oz
-    food_items.sort(key=lambda x: next(item.calories_per_oz for item in items if item.name == x[0]), reverse=True)
+    # Reduce the food item with highest calories per oz (first one on ties)
+    food = foods[np.argmax(basket.calories_per_oz[foods])]
+    food_reduction_oz = treat_calories / basket.calories_per_oz[food]
     
-    food_name, food_qty = food_items[0]
-    food_item = next(item for item in items if item.name == food_name)
-    food_reduction_oz = treat_calories / food_item.calories_per_oz
-    
-    if food_reduction_oz >= food_qty:
-        return []  # Can't reduce enough
+    if food_reduction_oz >= quantities[food]:
+        return None  # Can't reduce enough
     
     # Apply reduction
-    for i, (name, qty) in enumerate(new_result):
-        if name == food_name:
-            new_result[i] = (name, qty - food_reduction_oz)
-            break
-    
-    return new_result
+    quantities[food] -= food_reduction_oz
+    return quantities
 
 
-def _flexible_treat_optimization(items: List[Item], total_calories: float) -> List[Tuple[str, float]]:
+def _flexible_treat_optimization(basket: FoodBasket, total_calories: float) -> Optional[np.ndarray]:
     """
     Flexible optimization that prioritizes treat inclusion.
     
     Uses a weighted objective that balances nutrition quality with treat inclusion.
     
     Args:
-        items: List of Item objects
+        basket: FoodBasket of the items to choose from
         total_calories: Target calories
     
     Returns:
-        List of tuples [(item_name, quantity_in_oz), ...] or empty list if no solution
+        Quantity of each item in ounces, rounded to 2 decimals, or None if no solution
     """
-    num_items = len(items)
-    
-    def objective(quantities):
-        """Weighted objective: nutrition quality + treat inclusion bonus."""
-        total_oz = sum(quantities) + 1e-10
-        
-        # Calculate macronutrient ratios
-        weighted_protein = sum(quantities[i] * items[i].min_protein 
-                              for i in range(num_items)) / total_oz
-        weighted_carbs = sum(quantities[i] * items[i].max_carbs 
-                            for i in range(num_items)) / total_oz
-        weighted_fat = sum(quantities[i] * items[i].min_fat 
-                          for i in range(num_items)) / total_oz
-        
-        # Nutrition penalties (minimize violations)
-        adjusted_carbs = weighted_carbs * (1 - config.CARB_OVERESTIMATION_FACTOR)
-        protein_penalty = (max(0, config.MACRONUTRIENT_TARGETS['protein'] - weighted_protein)) ** 2
-        carbs_penalty = (max(0, adjusted_carbs - config.MACRONUTRIENT_TARGETS['carbs'])) ** 2
-        fat_penalty = (max(0, config.MACRONUTRIENT_TARGETS['fat'] - weighted_fat)) ** 2
-        
-        # Treat limit penalty
-        treat_calories = sum(quantities[i] * items[i].calories_per_oz 
-                           for i in range(num_items) if items[i].item_type == 'treat')
-        treat_limit_penalty = (max(0, treat_calories - total_calories * 0.1)) ** 2
-        
-        # Treat inclusion bonus (negative penalty for including treats)
-        treat_quantity = sum(quantities[i] for i in range(num_items) if items[i].item_type == 'treat')
-        treat_bonus = -min(treat_quantity, 0.1) * 10  # Bonus for up to 0.1 oz of treats
-        
-        # Quantity penalty (prefer minimal solutions)
-        quantity_penalty = sum(quantities) * 0.01
-        
-        return (protein_penalty + carbs_penalty + fat_penalty + treat_limit_penalty + 
-                treat_bonus + quantity_penalty)
-    
-    def calorie_constraint(quantities):
-        """Ensure total calories equal target."""
-        return sum(quantities[i] * items[i].calories_per_oz 
-                   for i in range(num_items)) - total_calories
+    num_items = len(basket)
+    calories_per_oz = basket.calories_per_oz
+    is_treat = basket.is_treat
+    treat_calories_per_oz = basket.treat_calories_per_oz
+    macros = np.stack((basket.min_protein, basket.max_carbs, basket.min_fat))
+    objective_args = (macros, treat_calories_per_oz, is_treat, total_calories, _penalty_targets())
     
     # Initial guess: equal distribution with slight treat preference
-    initial_guess = np.array([total_calories / (num_items * items[i].calories_per_oz) 
-                              for i in range(num_items)])
+    initial_guess = total_calories / (num_items * calories_per_oz)
+    initial_guess[is_treat] *= 1.5
     
-    # Boost treat quantities in initial guess
-    for i in range(num_items):
-        if items[i].item_type == 'treat':
-            initial_guess[i] *= 1.5
-    
-    constraints = [{'type': 'eq', 'fun': calorie_constraint}]
-    bounds = [(0, None) for _ in range(num_items)]
+    constraints = [{'type': 'eq', 'fun': _calorie_residual, 'jac': _calorie_residual_jacobian, 
+                    'args': (calories_per_oz, total_calories)}]
+    bounds = Bounds(np.zeros(num_items), np.inf)
     
     # Try optimization
-    result = minimize(objective, initial_guess, method='SLSQP', 
-                      bounds=bounds, constraints=constraints)
+    result = minimize(_flexible_treat_objective, initial_guess, args=objective_args, 
+                      method='SLSQP', jac=True, bounds=bounds, constraints=constraints)
     
     if result.success:
-        quantities = [(items[i].name, round(float(result.x[i]), 2)) 
-                      for i in range(num_items)]
+        quantities = np.round(result.x, 2)
         
         # Check if we actually included treats
-        treat_quantities = [qty for name, qty in quantities 
-                           if qty > 0 and any(item.name == name and item.item_type == 'treat' 
-                                            for item in items)]
-        
-        if treat_quantities:
+        if (quantities[is_treat] > 0).any():
             return quantities
     
-    return []
+    return None
+
+
+def _flexible_treat_objective(quantities: np.ndarray, macros: np.ndarray, 
+                              treat_calories_per_oz: np.ndarray, is_treat: np.ndarray, 
+                              total_calories: float, 
+                              targets: Tuple[float, float, float, float]) -> Tuple[float, np.ndarray]:
+    """
+    Objective of _flexible_treat_optimization, with its analytic gradient.
+    
+    The _approximation_penalty terms (nutrition violations, treat limit and
+    quantity) minus a bonus of 10 per oz of treats, for up to 0.1 oz.
+    
+    Args:
+        quantities: Quantity of each item in ounces
+        macros, treat_calories_per_oz, total_calories, targets: As for _approximation_penalty
+        is_treat: Whether each item is a treat (boolean array)
+    
+    Returns:
+        Tuple of (objective value, gradient with respect to quantities)
+    """
+    value, gradient = _approximation_penalty(quantities, macros, treat_calories_per_oz, 
+                                             total_calories, targets)
+    treat_quantity = quantities[is_treat].sum()
+    
+    # The bonus only changes with treat quantity below its 0.1 oz cap
+    if treat_quantity < 0.1:
+        gradient[is_treat] -= 10
+    return value - min(treat_quantity, 0.1) * 10, gradient
 
 
-def _find_best_approximation(items: List[Item], total_calories: float,
-                             bounds: List[Tuple], num_items: int, include_treat: bool = False) -> List[Tuple[str, float]]:
+def _penalty_targets() -> Tuple[float, float, float, float]:
+    """
+    Read the macronutrient targets from config once per solve.
+    
+    Returns:
+        Tuple of (protein target, carbs target, fat target, carb factor), where
+        carb factor corrects carbs for crude fiber overestimation
+    """
+    targets = config.MACRONUTRIENT_TARGETS
+    return (targets['protein'], targets['carbs'], targets['fat'], 
+            1 - config.CARB_OVERESTIMATION_FACTOR)
+
+
+def _approximation_penalty(quantities: np.ndarray, macros: np.ndarray, 
+                           treat_calories_per_oz: np.ndarray, total_calories: float, 
+                           targets: Tuple[float, float, float, float]) -> Tuple[float, np.ndarray]:
+    """
+    Sum of squared constraint violations plus a small quantity penalty.
+    
+    This is the SLSQP objective of _find_best_approximation. It works on plain
+    arrays only, so no per-call closure or Item attribute access is involved.
+    It also returns the analytic gradient, so SLSQP does not need finite
+    differences (num_items + 1 calls per step).
+    
+    Args:
+        quantities: Quantity of each item in ounces
+        macros: Per-item dry matter protein, carbs and fat percentages stacked
+            as the rows of a (3, num_items) array
+        treat_calories_per_oz: Calories per ounce for treats, 0 for food
+        total_calories: Target calories
+        targets: (protein, carbs, fat, carb_factor) from _penalty_targets
+    
+    Returns:
+        Tuple of (objective value, gradient with respect to quantities)
+    """
+    protein_target, carbs_target, fat_target, carb_factor = targets
+    quantity_sum = quantities.sum()
+    total_oz = quantity_sum + 1e-10  # Avoid division by zero
+    
+    # All three weighted averages from one matrix-vector product
+    weighted = macros @ quantities / total_oz
+    weighted_protein, weighted_carbs, weighted_fat = weighted.tolist()
+    
+    # Penalize constraint violations
+    adjusted_carbs = weighted_carbs * carb_factor
+    protein_violation = max(0, protein_target - weighted_protein)
+    carbs_violation = max(0, adjusted_carbs - carbs_target)
+    fat_violation = max(0, fat_target - weighted_fat)
+    
+    # Treat limit penalty
+    treat_calories = quantities @ treat_calories_per_oz
+    treat_violation = max(0, treat_calories - total_calories * 0.1)
+    
+    # Small penalty on total quantity
+    quantity_penalty = quantity_sum * 0.01
+    
+    value = (protein_violation ** 2 + carbs_violation ** 2 + fat_violation ** 2 + 
+             treat_violation ** 2 + quantity_penalty)
+    
+    # d(weighted_x)/dq_i = (x_i - weighted_x) / total_oz, so the macro terms
+    # combine into one vector-matrix product over the stacked rows
+    coefficients = np.array([-2 * protein_violation, 2 * carbs_violation * carb_factor, 
+                             -2 * fat_violation])
+    gradient = (coefficients @ macros - coefficients @ weighted) / total_oz
+    gradient += 2 * treat_violation * treat_calories_per_oz + 0.01
+    
+    return value, gradient
+
+
+def _calorie_residual(quantities: np.ndarray, calories_per_oz: np.ndarray, 
+                      total_calories: float) -> float:
+    """Calorie equality constraint: zero when total calories equal the target."""
+    return quantities @ calories_per_oz - total_calories
+
+
+def _calorie_residual_jacobian(quantities: np.ndarray, calories_per_oz: np.ndarray, 
+                               total_calories: float) -> np.ndarray:
+    """Gradient of the calorie equality constraint (constant)."""
+    return calories_per_oz
+
+
+def _find_best_approximation(basket: FoodBasket, total_calories: float,
+                             bounds: Bounds, num_items: int, include_treat: bool = False, 
+                             initial_guess: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
     """
     Find best approximation when exact solution is infeasible.
     
@@ -553,57 +1024,43 @@ def _find_best_approximation(items: List[Item], total_calories: float,
     maintaining the calorie requirement.
     
     Args:
-        items: List of Item objects
+        basket: FoodBasket of the items to choose from
         total_calories: Target total calories
         bounds: Quantity bounds for each item
         num_items: Number of items
         include_treat: Whether to include treats (ignored in this simplified version)
+        initial_guess: Starting quantities for SLSQP, e.g. the point where linprog
+            stopped; defaults to an equal calorie split across items, which is
+            also used if the given point has non-finite values
     
     Returns:
-        List of tuples [(item_name, quantity_in_oz), ...]
-        Returns empty list if optimization fails
-    """
-    def objective(quantities):
-        """Minimize sum of squared constraint violations."""
-        total_oz = sum(quantities) + 1e-10  # Avoid division by zero
-        weighted_protein = sum(quantities[i] * items[i].min_protein 
-                              for i in range(num_items)) / total_oz
-        weighted_carbs = sum(quantities[i] * items[i].max_carbs 
-                            for i in range(num_items)) / total_oz
-        weighted_fat = sum(quantities[i] * items[i].min_fat 
-                          for i in range(num_items)) / total_oz
-        
-        # Penalize constraint violations
-        adjusted_carbs = weighted_carbs * (1 - config.CARB_OVERESTIMATION_FACTOR)
-        protein_penalty = (max(0, config.MACRONUTRIENT_TARGETS['protein'] - weighted_protein)) ** 2
-        carbs_penalty = (max(0, adjusted_carbs - config.MACRONUTRIENT_TARGETS['carbs'])) ** 2
-        fat_penalty = (max(0, config.MACRONUTRIENT_TARGETS['fat'] - weighted_fat)) ** 2
-        
-        # Treat limit penalty
-        treat_calories = sum(quantities[i] * items[i].calories_per_oz 
-                           for i in range(num_items) if items[i].item_type == 'treat')
-        treat_limit_penalty = (max(0, treat_calories - total_calories * 0.1)) ** 2
-        
-        # Small penalty on total quantity
-        quantity_penalty = sum(quantities) * 0.01
-        
-        return protein_penalty + carbs_penalty + fat_penalty + treat_limit_penalty + quantity_penalty
-    
-    def calorie_constraint(quantities):
-        """Ensure total calories equal target."""
-        return sum(quantities[i] * items[i].calories_per_oz 
-                   for i in range(num_items)) - total_calories
+        Unrounded quantity of each item in ounces, or None if optimization fails
+    """
+    calories_per_oz = basket.calories_per_oz
+    treat_calories_per_oz = basket.treat_calories_per_oz
+    macros = np.stack((basket.min_protein, basket.max_carbs, basket.min_fat))
+    penalty_args = (macros, treat_calories_per_oz, total_calories, _penalty_targets())
     
-    # Initial guess: equal distribution
-    initial_guess = np.array([total_calories / (num_items * items[i].calories_per_oz) 
-                              for i in range(num_items)])
-    constraints = [{'type': 'eq', 'fun': calorie_constraint}]
+    # Default initial guess: equal distribution
+    if initial_guess is None or not np.isfinite(initial_guess).all():
+        initial_guess = total_calories / (num_items * calories_per_oz)
+    constraints = [{'type': 'eq', 'fun': _calorie_residual, 'jac': _calorie_residual_jacobian, 
+                    'args': (calories_per_oz, total_calories)}]
     
-    nonlinear_result = minimize(objective, initial_guess, method='SLSQP', 
-                               bounds=bounds, constraints=constraints)
+    nonlinear_result = minimize(_approximation_penalty, initial_guess, args=penalty_args, 
+                               method='SLSQP', jac=True, bounds=bounds, constraints=constraints)
     
     if nonlinear_result.success:
-        return [(items[i].name, round(float(nonlinear_result.x[i]), 2)) 
-                for i in range(num_items)]
-    
-    return []
+        return nonlinear_result.x
+    
+    # With the analytic gradient, SLSQP can end its line search (status 8) at
+    # a point it would otherwise accept; keep it if it is within
+    # _SLSQP_STOP_TOLERANCE of the calorie target and non-negative
+    quantities = nonlinear_result.x
+    calorie_error = abs(_calorie_residual(quantities, calories_per_oz, total_calories))
+    if (nonlinear_result.status == 8 and 
+            calorie_error <= _SLSQP_STOP_TOLERANCE * total_calories and 
+            quantities.min() >= -_SLSQP_STOP_TOLERANCE):
+        return quantities
+    
+    return None